@@ -5,7 +5,7 @@ Main package for the AI-driven interview scheduling system
 
 from .slot_manager import SlotManager
 from .email_parser import EmailParser
-from .backend_client import BackendClient
+from .backend_client import BackendClient, BackendUnavailable
 
 __version__ = "1.0.0"
-__all__ = ["SlotManager", "EmailParser", "BackendClient"] 
\ No newline at end of file
+__all__ = ["SlotManager", "EmailParser", "BackendClient", "BackendUnavailable"] 
\ No newline at end of file
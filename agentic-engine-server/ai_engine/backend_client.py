@@ -3,85 +3,193 @@ Backend Client for Interview Scheduler AI Engine
 Handles communication with Node.js backend API
 """
 
+import asyncio
+import atexit
+import threading
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import logging
 from typing import Dict, Optional, List
 import os
+import time
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Connect fast or fail fast; reads get a little longer for Graph-backed calls
+DEFAULT_TIMEOUT = (2.0, 8.0)
+
+class BackendUnavailable(Exception):
+    """Raised when the Node.js backend cannot be reached or keeps failing"""
+    pass
+
+# One process-wide session: every SchedulerAgent (one per concurrent
+# scheduling session) shares the same TCP connection pool
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+def _shared_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=10,
+                    pool_maxsize=64,
+                    # urllib3's default method set retries idempotent verbs
+                    # only; opting POST in would double-send emails and
+                    # double-create events when a response is lost after the
+                    # backend already processed the request
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.25,
+                        status_forcelist=[502, 503, 504]
+                    )
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                atexit.register(session.close)
+                _SESSION = session
+    return _SESSION
+
 class BackendClient:
     def __init__(self, base_url: str = "http://localhost:3009"):
         self.base_url = base_url
         self.session_id = None
-    
-    def start_session(self, recruiter_email: str, candidate_email: str) -> Dict:
-        """Start a new scheduling session"""
+        # Shared keep-alive pool: all BackendClient instances in the process
+        # reuse the same sockets (requests.Session is thread-safe for this
+        # request pattern)
+        self.session = _shared_session()
+        # Async client for calls that can be overlapped (e.g. sending the
+        # confirmation email while creating the calendar event)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+        )
+        # Dedicated long-lived loop for the async client: running coroutines
+        # via asyncio.run would bind pooled keep-alive connections to a loop
+        # that is closed when the call returns, breaking the next invocation
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="backend-client-loop", daemon=True
+        )
+        self._loop_thread.start()
+        # EWMA of observed GET latencies, used to pick the hedge delay
+        self._latency_ewma = 0.3
+        # Health-check cache: a recent success is trusted for a few seconds,
+        # repeated failures back off exponentially up to 30s
+        self._health_ttl = 5.0
+        self._last_ok_at = 0.0
+        self._next_check_at = 0.0
+        self._health_backoff = 1.0
+
+    def run_async(self, coro):
+        """Run a coroutine on the client's dedicated loop and wait for it.
+
+        All async calls from sync code go through here so the httpx client
+        and its keep-alive pool stay bound to one living event loop.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        """Close the async client and its loop thread.
+
+        The sync session is process-wide (closed via atexit), so only the
+        per-instance async resources are torn down here.
+        """
+        if self._loop.is_closed():
+            return
         try:
-            response = requests.post(f"{self.base_url}/start", json={
-                "recruiterEmail": recruiter_email,
-                "candidateEmail": candidate_email
-            })
+            self.run_async(self.client.aclose())
+        except Exception as e:
+            logger.warning("Error closing async client: %s", e)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        self._loop.close()
+
+    async def aclose(self):
+        """Close the async HTTP client (the shared sync session stays open)"""
+        await self.client.aclose()
+
+    def _request(self, method: str, path: str, *, json: Optional[Dict] = None, params: Optional[Dict] = None, timeout=DEFAULT_TIMEOUT) -> Dict:
+        """
+        Single path for every sync backend call: shared session, timeout,
+        retry policy and error mapping all live here
+        """
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", json=json, params=params, timeout=timeout)
             response.raise_for_status()
-            result = response.json()
-            self.session_id = result.get("session", {}).get("id")
-            return result
+            return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"Error starting session: {e}")
-            return {"error": str(e)}
+            logger.error("Backend %s %s failed: %s", method, path, e)
+            raise BackendUnavailable(f"Backend {method} {path} failed: {e}") from e
+
+    def start_session(self, recruiter_email: str, candidate_email: str) -> Dict:
+        """Start a new scheduling session"""
+        result = self._request("POST", "/start", json={
+            "recruiterEmail": recruiter_email,
+            "candidateEmail": candidate_email
+        })
+        self.session_id = result.get("session", {}).get("id")
+        return result
     
     def reset_session(self) -> Dict:
         """Reset the current session"""
-        try:
-            response = requests.post(f"{self.base_url}/reset")
-            response.raise_for_status()
-            self.session_id = None
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error resetting session: {e}")
-            return {"error": str(e)}
+        result = self._request("POST", "/reset")
+        self.session_id = None
+        return result
     
     def get_status(self) -> Dict:
         """Get current session status"""
-        try:
-            response = requests.get(f"{self.base_url}/status")
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error getting status: {e}")
-            return {"error": str(e)}
+        return self._request("GET", "/status")
     
     def send_email(self, to: str, subject: str, body: str) -> Dict:
         """Send email via backend"""
-        try:
-            response = requests.post(f"{self.base_url}/sendEmail", json={
-                "to": to,
-                "subject": subject,
-                "body": body
-            })
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error sending email: {e}")
-            return {"error": str(e)}
+        return self._request("POST", "/sendEmail", json={
+            "to": to,
+            "subject": subject,
+            "body": body
+        })
     
     def receive_email(self, from_email: str, subject: str, body: str) -> Dict:
         """Simulate receiving email from candidate"""
+        return self._request("POST", "/receiveEmail", json={
+            "from": from_email,
+            "subject": subject,
+            "body": body
+        })
+    
+    def create_calendar_event(self, start_time: str, end_time: str, subject: str, location: str = "Virtual Interview") -> Dict:
+        """Create calendar event via backend"""
+        return self._request("POST", "/createEvent", json={
+            "startTime": start_time,
+            "endTime": end_time,
+            "subject": subject,
+            "location": location
+        })
+    
+    async def send_email_async(self, to: str, subject: str, body: str) -> Dict:
+        """Send email via backend (async variant for concurrent calls)"""
         try:
-            response = requests.post(f"{self.base_url}/receiveEmail", json={
-                "from": from_email,
+            response = await self.client.post("/sendEmail", json={
+                "to": to,
                 "subject": subject,
                 "body": body
             })
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error receiving email: {e}")
-            return {"error": str(e)}
-    
-    def create_calendar_event(self, start_time: str, end_time: str, subject: str, location: str = "Virtual Interview") -> Dict:
-        """Create calendar event via backend"""
+        except httpx.HTTPError as e:
+            logger.error("Error sending email: %s", e)
+            raise BackendUnavailable(f"Error sending email: {e}") from e
+
+    async def create_calendar_event_async(self, start_time: str, end_time: str, subject: str, location: str = "Virtual Interview") -> Dict:
+        """Create calendar event via backend (async variant for concurrent calls)"""
         try:
-            response = requests.post(f"{self.base_url}/createEvent", json={
+            response = await self.client.post("/createEvent", json={
                 "startTime": start_time,
                 "endTime": end_time,
                 "subject": subject,
@@ -89,20 +197,33 @@ class BackendClient:
             })
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error creating calendar event: {e}")
-            return {"error": str(e)}
-    
-    def is_backend_available(self) -> bool:
-        """Check if backend is available"""
-        try:
-            response = requests.get(f"{self.base_url}/status", timeout=5)
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
-            return False 
+        except httpx.HTTPError as e:
+            logger.error("Error creating calendar event: %s", e)
+            raise BackendUnavailable(f"Error creating calendar event: {e}") from e
 
-    def fetch_recruiter_slots(self, start: Optional[str] = None, end: Optional[str] = None, duration_minutes: int = 60, calendar_id: Optional[str] = None) -> Dict:
-        """Fetch recruiter availability slots from backend /recruiterSlots"""
+    async def _hedged_get(self, path: str, *, hedge_after: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        GET with request hedging: if the first attempt is slower than the
+        hedge delay, fire a duplicate and take whichever finishes first.
+        Collapses long-tail latency to roughly p50 + hedge delay.
+        """
+        if hedge_after is None:
+            # Hedge once the call is clearly slower than typical (~2x EWMA)
+            hedge_after = max(0.1, 2 * self._latency_ewma)
+        started = asyncio.get_event_loop().time()
+        task1 = asyncio.create_task(self.client.get(path, **kwargs))
+        done, pending = await asyncio.wait({task1}, timeout=hedge_after)
+        if not done:
+            task2 = asyncio.create_task(self.client.get(path, **kwargs))
+            done, pending = await asyncio.wait({task1, task2}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        elapsed = asyncio.get_event_loop().time() - started
+        self._latency_ewma = 0.8 * self._latency_ewma + 0.2 * elapsed
+        return done.pop().result()
+
+    async def fetch_recruiter_slots_async(self, start: Optional[str] = None, end: Optional[str] = None, duration_minutes: int = 60, calendar_id: Optional[str] = None) -> Dict:
+        """Fetch recruiter availability slots from backend (async variant)"""
         try:
             params = {"durationMinutes": str(duration_minutes)}
             if start:
@@ -111,12 +232,42 @@ class BackendClient:
                 params["end"] = end
             if calendar_id:
                 params["calendarId"] = calendar_id
-            print(f"[BackendClient] GET /recruiterSlots params={params}")
-            response = requests.get(f"{self.base_url}/recruiterSlots", params=params, timeout=10)
+            response = await self._hedged_get("/recruiterSlots", params=params)
             response.raise_for_status()
-            data = response.json()
-            print(f"[BackendClient] /recruiterSlots -> {len(data.get('slots', []))} slots")
-            return data
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching recruiter slots: {e}")
-            return {"error": str(e)} 
\ No newline at end of file
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error("Error fetching recruiter slots: %s", e)
+            raise BackendUnavailable(f"Error fetching recruiter slots: {e}") from e
+
+    def is_backend_available(self) -> bool:
+        """Check if backend is available (cached; re-pings only after TTL)"""
+        now = time.monotonic()
+        if now - self._last_ok_at < self._health_ttl:
+            return True
+        if now < self._next_check_at:
+            # Still inside the failure backoff window
+            return False
+        try:
+            response = self.session.get(f"{self.base_url}/status", timeout=DEFAULT_TIMEOUT)
+            if response.status_code == 200:
+                self._last_ok_at = now
+                self._health_backoff = 1.0
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        self._next_check_at = now + self._health_backoff
+        self._health_backoff = min(self._health_backoff * 2, 30.0)
+        return False
+
+    def fetch_recruiter_slots(self, start: Optional[str] = None, end: Optional[str] = None, duration_minutes: int = 60, calendar_id: Optional[str] = None) -> Dict:
+        """Fetch recruiter availability slots from backend /recruiterSlots.
+
+        Delegates to the hedged async variant on the client's loop so the
+        scheduling tools (the hot path for this endpoint) get tail-latency
+        hedging too, not just async callers.
+        """
+        data = self.run_async(
+            self.fetch_recruiter_slots_async(start, end, duration_minutes, calendar_id)
+        )
+        logger.debug("/recruiterSlots -> %d slots", len(data.get('slots', [])))
+        return data
@@ -5,18 +5,62 @@ Extracts candidate proposed slots from natural language email responses
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+import hashlib
+import json
 import re
+from cachetools import TTLCache
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field
 
-class EmailParser:
-    def __init__(self, llm_model: str = "gemini-1.5-flash"):
-        self.llm = ChatGoogleGenerativeAI(model=llm_model, temperature=0)
-        self.parsing_prompt = self._create_parsing_prompt()
-    
-    def _create_parsing_prompt(self) -> ChatPromptTemplate:
-        """Create prompt template for parsing candidate email responses"""
-        return ChatPromptTemplate.from_template("""
+try:
+    import ciso8601
+    _parse_datetime = ciso8601.parse_datetime
+except ImportError:  # C extension not installed; stdlib handles common forms
+    def _parse_datetime(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+try:
+    import pandas as pd
+except ImportError:  # optional: only used to batch-validate large slot lists
+    pd = None
+
+# Below this many slots the per-slot parser beats pandas' call overhead
+_BATCH_VALIDATE_MIN = 8
+
+# Precompiled patterns: these run on every parsed email, so compile once at
+# import instead of per call
+_JSON_ARRAY_RE = re.compile(r'\[.*?\]', re.DOTALL)
+_JSON_OBJ_RE = re.compile(r'\{.*?\}', re.DOTALL)
+# Rule pass for extract_scheduling_intent: obvious phrasings are classified
+# without an LLM round-trip. Unavailability is checked first so "can't make
+# any of those times" doesn't count as a proposed slot.
+_UNAVAILABLE_RE = re.compile(r"\b(cannot|can'?t|unavailable|none\s+(?:of\s+(?:these|those)\s+)?work|not\s+available)\b", re.IGNORECASE)
+_FLEXIBLE_RE = re.compile(r"\b(flexible|any\s?time|whenever|anytime)\b", re.IGNORECASE)
+_TIME_HINT_RE = re.compile(r"\b\d{1,2}(:\d{2})?\s*([ap]\.?m\.?)\b|\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}:\d{2}\b", re.IGNORECASE)
+# Last-resort matcher for slots the ISO parser rejects; groups feed a
+# datetime() construction so out-of-range components still fail
+_LOOSE_DT_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})(?::(\d{2}))?$')
+_TIME_PATTERNS = [
+    re.compile(r'(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)'),  # 2:30 PM
+    re.compile(r'(\d{1,2})\s*(AM|PM|am|pm)'),          # 2 PM
+    re.compile(r'(\d{1,2}):(\d{2})'),                  # 14:30
+    re.compile(r'(\d{1,2})\s*([ap]m)'),                # 2 pm
+]
+
+class SlotList(BaseModel):
+    """Structured-output schema for proposed interview slots"""
+    slots: List[str] = Field(default_factory=list, description="Proposed interview times as ISO 8601 datetime strings")
+
+class SchedulingIntent(BaseModel):
+    """Structured-output schema for scheduling intent classification"""
+    intent: str = Field(description="One of: proposed_slots, flexible, unavailable, unclear")
+    confidence: float = Field(description="Classification confidence between 0 and 1")
+    reasoning: str = Field(description="Short explanation of the classification")
+
+# Prompt templates are parsed once at import; template construction is not
+# free and these never change per instance
+_PARSING_PROMPT = ChatPromptTemplate.from_template("""
 You are an expert at parsing interview scheduling emails. Extract proposed interview slots from the candidate's email response.
 
 Email from candidate:
@@ -37,6 +81,90 @@ Return ONLY a JSON array of ISO datetime strings. Example:
 
 If no specific times found, return: []
 """)
+
+_INTENT_PROMPT = ChatPromptTemplate.from_template("""
+Analyze this candidate email response for scheduling intent:
+
+Email: {email_content}
+
+Classify the intent as one of:
+- "proposed_slots": Candidate proposed specific time slots
+- "flexible": Candidate is flexible but no specific times
+- "unavailable": Candidate is unavailable for proposed times
+- "unclear": Intent is unclear or ambiguous
+
+Return JSON: {{"intent": "intent_type", "confidence": 0.9, "reasoning": "explanation"}}
+""")
+
+class EmailParser:
+    def __init__(self, llm_model: str = "gemini-1.5-flash"):
+        self.llm = ChatGoogleGenerativeAI(model=llm_model, temperature=0)
+        self.llm_model = llm_model
+        self.parsing_prompt = _PARSING_PROMPT
+        # Structured-output runnables: Gemini returns parsed objects
+        # directly, skipping the regex + json.loads pass and the malformed
+        # output failure mode. The pinned langchain-core predates
+        # with_structured_output, so fall back to the free-text paths when
+        # the installed version doesn't provide it.
+        if hasattr(self.llm, "with_structured_output"):
+            self._slot_llm = self.llm.with_structured_output(SlotList)
+            self._intent_llm = self.llm.with_structured_output(SchedulingIntent)
+        else:
+            self._slot_llm = None
+            self._intent_llm = None
+        # Exact-match response cache: temperature=0 makes identical prompts
+        # deterministic, so repeated emails (agent retries, dev reruns) skip
+        # the LLM round-trip entirely
+        self._llm_cache = TTLCache(maxsize=1024, ttl=3600)
+
+    def _cache_key(self, prompt) -> str:
+        return hashlib.sha256(f"{self.llm_model}\n{prompt}".encode()).hexdigest()
+
+    def _invoke_cached(self, prompt):
+        """Invoke the LLM, serving repeats of the same prompt from cache"""
+        key = self._cache_key(prompt)
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.llm.invoke(prompt)
+        self._llm_cache[key] = response
+        return response
+
+    def _stream_until_json_array(self, prompt) -> str:
+        """
+        Stream the LLM response and stop consuming once the first balanced
+        JSON array has arrived; trailing prose/whitespace generation is never
+        waited on. Falls back to a buffered invoke if streaming fails.
+        """
+        key = self._cache_key(prompt)
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            return cached if isinstance(cached, str) else cached.content
+        chunks = []
+        depth = 0
+        seen_array = False
+        try:
+            for chunk in self.llm.stream(prompt):
+                text = chunk.content
+                chunks.append(text)
+                done = False
+                for ch in text:
+                    if ch == '[':
+                        depth += 1
+                        seen_array = True
+                    elif ch == ']':
+                        depth -= 1
+                        if seen_array and depth <= 0:
+                            done = True
+                            break
+                if done:
+                    break
+            result = ''.join(chunks)
+        except Exception as e:
+            print(f"Streaming parse failed, falling back to buffered invoke: {e}")
+            return self._invoke_cached(prompt).content
+        self._llm_cache[key] = result
+        return result
     
     def parse_candidate_response(self, email_content: str) -> List[str]:
         """
@@ -49,18 +177,29 @@ If no specific times found, return: []
             List of ISO datetime strings representing proposed slots
         """
         try:
-            current_datetime = datetime.now().isoformat()
-            
-            # Use LLM to parse the email
-            response = self.llm.invoke(
-                self.parsing_prompt.format(
-                    email_content=email_content,
-                    current_datetime=current_datetime
-                )
+            # Minute granularity keeps retried emails cache-hittable while
+            # still anchoring relative times like "tomorrow"
+            current_datetime = datetime.now().replace(second=0, microsecond=0).isoformat()
+
+            prompt = self.parsing_prompt.format(
+                email_content=email_content,
+                current_datetime=current_datetime
             )
-            
-            # Extract JSON from response
-            parsed_slots = self._extract_json_from_response(response.content)
+
+            # Prefer structured output when available: the SDK hands back a
+            # SlotList, no regex/json extraction needed
+            key = self._cache_key(f"slots:{prompt}")
+            parsed_slots = self._llm_cache.get(key)
+            if parsed_slots is None and self._slot_llm is not None:
+                try:
+                    parsed_slots = self._slot_llm.invoke(prompt).slots
+                    self._llm_cache[key] = parsed_slots
+                except Exception as structured_error:
+                    # Fall back to the streaming free-text path
+                    print(f"Structured slot parse failed, using text path: {structured_error}")
+            if parsed_slots is None:
+                response_text = self._stream_until_json_array(prompt)
+                parsed_slots = self._extract_json_from_response(response_text)
             
             # Validate and clean the slots
             validated_slots = self._validate_slots(parsed_slots)
@@ -76,9 +215,7 @@ If no specific times found, return: []
         """Extract JSON array from LLM response"""
         try:
             # Look for JSON array in the response
-            import json
-            # Find JSON array pattern
-            json_match = re.search(r'\[.*?\]', response_content, re.DOTALL)
+            json_match = _JSON_ARRAY_RE.search(response_content)
             if json_match:
                 json_str = json_match.group()
                 return json.loads(json_str)
@@ -91,71 +228,51 @@ If no specific times found, return: []
     
     def _validate_slots(self, slots: List[str]) -> List[str]:
         """Validate and clean parsed slots"""
+        # The LLM's JSON array can contain non-string junk (null, numbers);
+        # drop those up front so one bad element can't abort validation and
+        # discard every valid slot
+        cleaned = [s.strip() for s in slots if isinstance(s, str)]
+
+        if pd is not None and len(cleaned) >= _BATCH_VALIDATE_MIN:
+            # One vectorized C pass over the whole list; invalid entries
+            # become NaT instead of raising per slot. format='mixed' parses
+            # each element independently — without it pandas infers the
+            # format from the first slot and coerces differently-formatted
+            # valid slots to NaT
+            parsed = pd.to_datetime(cleaned, errors='coerce', utc=True, format='mixed')
+            return [slot for slot, ts in zip(cleaned, parsed) if not pd.isna(ts)]
+
         validated_slots = []
-        
-        for slot in slots:
+
+        for slot_clean in cleaned:
             try:
-                # Try different parsing approaches
-                slot_clean = slot.strip()
-                
-                # Handle UTC format with Z suffix
-                if slot_clean.endswith('Z'):
-                    # Try parsing with Z suffix first
+                # Single-pass ISO 8601 parse (ciso8601 when available)
+                # instead of the old chain of strptime attempts
+                _parse_datetime(slot_clean)
+                validated_slots.append(slot_clean)
+            except (ValueError, TypeError):
+                # Shape alone is not enough: build a datetime from the
+                # groups so out-of-range values (month 13 etc.) are rejected
+                m = _LOOSE_DT_RE.match(slot_clean)
+                if m:
                     try:
-                        datetime.strptime(slot_clean, '%Y-%m-%dT%H:%M:%SZ')
+                        datetime(int(m[1]), int(m[2]), int(m[3]), int(m[4]), int(m[5]), int(m[6] or 0))
                         validated_slots.append(slot_clean)
                         continue
                     except ValueError:
                         pass
-                    
-                    # Try parsing with milliseconds
-                    try:
-                        datetime.strptime(slot_clean, '%Y-%m-%dT%H:%M:%S.%fZ')
-                        validated_slots.append(slot_clean)
-                        continue
-                    except ValueError:
-                        pass
-                
-                # Try standard ISO format
-                try:
-                    datetime.fromisoformat(slot_clean.replace('Z', '+00:00'))
-                    validated_slots.append(slot_clean)
-                    continue
-                except ValueError:
-                    pass
-                
-                # Try other common formats
-                for fmt in ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M']:
-                    try:
-                        datetime.strptime(slot_clean, fmt)
-                        validated_slots.append(slot_clean)
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    print(f"Invalid datetime format: {slot}")
-                    
-            except Exception as e:
-                print(f"Error validating slot {slot}: {e}")
-                continue
-        
+                print(f"Invalid datetime format: {slot_clean}")
+
         return validated_slots
-    
+
     def _fallback_regex_parsing(self, email_content: str) -> List[str]:
         """
         Fallback regex parsing for common time patterns
         Used when LLM parsing fails
         """
         slots = []
-        
-        # Common patterns for time extraction
-        patterns = [
-            r'(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)',  # 2:30 PM
-            r'(\d{1,2})\s*(AM|PM|am|pm)',          # 2 PM
-            r'(\d{1,2}):(\d{2})',                  # 14:30
-            r'(\d{1,2})\s*([ap]m)',                # 2 pm
-        ]
-        
+
+        # Time patterns are precompiled at module level (_TIME_PATTERNS)
         # This is a simplified fallback - in practice, you'd want more sophisticated parsing
         # For demo purposes, we'll return empty list and let the AI handle it
         return slots
@@ -167,28 +284,31 @@ If no specific times found, return: []
         Returns:
             Dict with intent classification and confidence
         """
-        intent_prompt = ChatPromptTemplate.from_template("""
-Analyze this candidate email response for scheduling intent:
+        # Cheap rule pass first: the cheapest LLM call is the one not made
+        if _UNAVAILABLE_RE.search(email_content):
+            return {"intent": "unavailable", "confidence": 0.95, "reasoning": "rule"}
+        if _TIME_HINT_RE.search(email_content):
+            return {"intent": "proposed_slots", "confidence": 0.95, "reasoning": "rule"}
+        if _FLEXIBLE_RE.search(email_content):
+            return {"intent": "flexible", "confidence": 0.95, "reasoning": "rule"}
 
-Email: {email_content}
-
-Classify the intent as one of:
-- "proposed_slots": Candidate proposed specific time slots
-- "flexible": Candidate is flexible but no specific times
-- "unavailable": Candidate is unavailable for proposed times
-- "unclear": Intent is unclear or ambiguous
+        prompt = _INTENT_PROMPT.format(email_content=email_content)
+        if self._intent_llm is not None:
+            try:
+                key = self._cache_key(f"intent:{prompt}")
+                intent = self._llm_cache.get(key)
+                if intent is None:
+                    intent = self._intent_llm.invoke(prompt)
+                    self._llm_cache[key] = intent
+                return intent.model_dump()
+            except Exception:
+                pass
 
-Return JSON: {{"intent": "intent_type", "confidence": 0.9, "reasoning": "explanation"}}
-""")
-        
         try:
-            response = self.llm.invoke(
-                intent_prompt.format(email_content=email_content)
-            )
+            response = self._invoke_cached(prompt)
             
             # Extract JSON from response
-            import json
-            json_match = re.search(r'\{.*?\}', response.content, re.DOTALL)
+            json_match = _JSON_OBJ_RE.search(response.content)
             if json_match:
                 return json.loads(json_match.group())
             else:
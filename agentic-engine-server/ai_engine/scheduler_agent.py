@@ -3,17 +3,25 @@ Scheduler Agent for Interview Scheduler AI Engine
 Main agent that orchestrates the interview scheduling workflow
 """
 
+import asyncio
 from typing import Dict, List, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import initialize_agent, AgentType, Tool
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationBufferWindowMemory
 from langchain_core.prompts import ChatPromptTemplate
-import json
+from cachetools import TTLCache
+from collections import deque
+from time import monotonic
+import hashlib
+import logging
+import orjson
 import os
 
+logger = logging.getLogger(__name__)
+
 from .slot_manager import SlotManager
 from .email_parser import EmailParser
-from .backend_client import BackendClient
+from .backend_client import BackendClient, BackendUnavailable
 
 class SchedulerAgent:
     def __init__(self, 
@@ -33,8 +41,10 @@ class SchedulerAgent:
             temperature=0
         )
         
-        # Initialize memory
-        self.memory = ConversationBufferMemory(
+        # Initialize memory: a bounded window keeps each ReAct step's prompt
+        # at O(k) messages instead of re-sending the whole conversation
+        self.memory = ConversationBufferWindowMemory(
+            k=6,
             memory_key="chat_history",
             return_messages=True
         )
@@ -44,11 +54,24 @@ class SchedulerAgent:
             "recruiter_email": None,
             "candidate_email": None,
             "current_stage": "initialized",
-            "conversation_history": [],
+            "conversation_history": deque(maxlen=50),
             "proposed_slots": [],
             "confirmed_slot": None
         }
         
+        # Full email bodies live here keyed by content hash; the
+        # conversation history only carries metadata + content_id so status
+        # dumps stay small as the session grows
+        self._email_archive: Dict[str, str] = {}
+
+        # Short-TTL cache of mapped recruiter slots so tools that re-enter
+        # within the same agent turn don't re-hit /recruiterSlots
+        self._slots_cache = TTLCache(maxsize=32, ttl=30)
+        # Freshness marker: when the previous tool in the same turn already
+        # fetched with the same params, reuse SlotManager's state outright
+        self._slots_fetched_at = None
+        self._last_fetch_params = None
+
         # Initialize agent with tools
         self.agent = self._initialize_agent()
     
@@ -86,6 +109,11 @@ class SchedulerAgent:
                 func=self._create_calendar_event_tool,
                 description="Create calendar event for confirmed interview slot"
             ),
+            Tool(
+                name="confirm_and_invite",
+                func=self._confirm_and_invite_tool,
+                description="Send confirmation email and create the calendar event for the confirmed slot in one step"
+            ),
             Tool(
                 name="send_follow_up_email",
                 func=self._send_follow_up_email_tool,
@@ -112,8 +140,23 @@ class SchedulerAgent:
 
     def _refresh_recruiter_slots_from_backend(self, start: Optional[str] = None, end: Optional[str] = None, duration_minutes: int = 60) -> List[Dict]:
         """Fetch recruiter slots from backend and map to SlotManager availability format."""
-        print(f"[SchedulerAgent] Refreshing recruiter slots from backend start={start} end={end} duration={duration_minutes}")
-        data = self.backend_client.fetch_recruiter_slots(start=start, end=end, duration_minutes=duration_minutes)
+        cache_key = (start, end, duration_minutes)
+        if (self._slots_fetched_at is not None
+                and self._last_fetch_params == cache_key
+                and monotonic() - self._slots_fetched_at < 30):
+            logger.debug("Reusing recruiter slots fetched %.1fs ago", monotonic() - self._slots_fetched_at)
+            return self.slot_manager.recruiter_availability
+        cached = self._slots_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Using cached recruiter slots for %s (%d slots)", cache_key, len(cached))
+            self.slot_manager.recruiter_availability = cached
+            return cached
+        logger.info("Refreshing recruiter slots from backend start=%s end=%s duration=%s", start, end, duration_minutes)
+        try:
+            data = self.backend_client.fetch_recruiter_slots(start=start, end=end, duration_minutes=duration_minutes)
+        except BackendUnavailable as e:
+            logger.warning("Backend unavailable while fetching slots: %s; keeping existing availability", e)
+            return []
         slots = data.get("slots", []) if isinstance(data, dict) else []
         mapped: List[Dict] = []
         for s in slots:
@@ -129,11 +172,20 @@ class SchedulerAgent:
             })
         if mapped:
             self.slot_manager.recruiter_availability = mapped
-            print(f"[SchedulerAgent] Updated recruiter_availability with {len(mapped)} slots")
+            self._slots_cache[cache_key] = mapped
+            self._slots_fetched_at = monotonic()
+            self._last_fetch_params = cache_key
+            logger.info("Updated recruiter_availability with %d slots", len(mapped))
         else:
-            print("[SchedulerAgent] No slots fetched from backend; keeping existing availability")
+            logger.info("No slots fetched from backend; keeping existing availability")
         return mapped
     
+    def _archive_content(self, content: str) -> str:
+        """Store full content out-of-band and return a short content id"""
+        content_id = hashlib.sha1(content.encode()).hexdigest()
+        self._email_archive[content_id] = content
+        return content_id
+
     def _start_session_tool(self, recruiter_email: str, candidate_email: str) -> str:
         """Tool to start a new scheduling session"""
         try:
@@ -182,7 +234,7 @@ Recruiter
             self.session_state["current_stage"] = "initial_email_sent"
             self.session_state["conversation_history"].append({
                 "type": "email_sent",
-                "content": email_body,
+                "content_id": self._archive_content(email_body),
                 "timestamp": "now"
             })
             
@@ -201,7 +253,7 @@ Recruiter
             self.session_state["current_stage"] = "candidate_response_parsed"
             self.session_state["conversation_history"].append({
                 "type": "email_received",
-                "content": email_content,
+                "content_id": self._archive_content(email_content),
                 "parsed_slots": proposed_slots,
                 "intent": intent,
                 "timestamp": "now"
@@ -230,6 +282,9 @@ Recruiter
             if best_match:
                 self.session_state["confirmed_slot"] = best_match
                 self.session_state["current_stage"] = "slot_confirmed"
+                # Availability changed; cached slot responses are now stale
+                self._slots_cache.clear()
+                self._slots_fetched_at = None
                 return f"Found matching slot: {best_match['intersection_start']} - {best_match['intersection_end']}"
             else:
                 self.session_state["current_stage"] = "no_intersection"
@@ -237,14 +292,9 @@ Recruiter
         except Exception as e:
             return f"Error finding slot intersection: {str(e)}"
     
-    def _send_confirmation_email_tool(self, slot_details: str = "") -> str:
-        """Tool to send confirmation email"""
-        try:
-            confirmed_slot = self.session_state["confirmed_slot"]
-            if not confirmed_slot:
-                return "No confirmed slot to send confirmation for"
-            
-            email_body = f"""
+    def _build_confirmation_email_body(self, confirmed_slot: Dict) -> str:
+        """Build the confirmation email body for a confirmed slot"""
+        return f"""
 Dear Candidate,
 
 Great! I'm confirming your interview for:
@@ -259,6 +309,60 @@ Please let me know if you need to reschedule.
 Best regards,
 Recruiter
 """
+
+    async def _confirm_and_invite(self) -> str:
+        """Send the confirmation email and create the calendar event concurrently"""
+        confirmed_slot = self.session_state["confirmed_slot"]
+        if not confirmed_slot:
+            return "No confirmed slot to confirm and invite for"
+
+        email_body = self._build_confirmation_email_body(confirmed_slot)
+
+        # The two POSTs are independent; overlap them instead of paying 2 RTTs
+        email_result, event_result = await asyncio.gather(
+            self.backend_client.send_email_async(
+                to=self.session_state["candidate_email"],
+                subject="Interview Confirmed",
+                body=email_body
+            ),
+            self.backend_client.create_calendar_event_async(
+                confirmed_slot["intersection_start"],
+                confirmed_slot["intersection_end"],
+                "Interview with Candidate"
+            )
+        )
+
+        self.session_state["conversation_history"].append({
+            "type": "email_sent",
+            "content_id": self._archive_content(email_body),
+            "timestamp": "now"
+        })
+        self.session_state["conversation_history"].append({
+            "type": "calendar_event_created",
+            "details": event_result,
+            "timestamp": "now"
+        })
+
+        return "Confirmation email sent and calendar event created"
+
+    def _confirm_and_invite_tool(self, context: str = "") -> str:
+        """Tool wrapper running the confirm + invite pair concurrently"""
+        try:
+            # Run on the client's persistent loop: asyncio.run closed its
+            # loop on return, invalidating the pooled keep-alive connections
+            # and breaking any repeat invocation on the same agent
+            return self.backend_client.run_async(self._confirm_and_invite())
+        except Exception as e:
+            return f"Error confirming and inviting: {str(e)}"
+
+    def _send_confirmation_email_tool(self, slot_details: str = "") -> str:
+        """Tool to send confirmation email"""
+        try:
+            confirmed_slot = self.session_state["confirmed_slot"]
+            if not confirmed_slot:
+                return "No confirmed slot to send confirmation for"
+            
+            email_body = self._build_confirmation_email_body(confirmed_slot)
             
             result = self.backend_client.send_email(
                 to=self.session_state["candidate_email"],
@@ -268,7 +372,7 @@ Recruiter
             
             self.session_state["conversation_history"].append({
                 "type": "email_sent",
-                "content": email_body,
+                "content_id": self._archive_content(email_body),
                 "timestamp": "now"
             })
             
@@ -330,7 +434,7 @@ Recruiter
             
             self.session_state["conversation_history"].append({
                 "type": "email_sent",
-                "content": email_body,
+                "content_id": self._archive_content(email_body),
                 "timestamp": "now"
             })
             
@@ -340,17 +444,14 @@ Recruiter
     
     def _get_session_status_tool(self) -> str:
         """Tool to get current session status"""
-        try:
-            status = {
-                "stage": self.session_state["current_stage"],
-                "recruiter": self.session_state["recruiter_email"],
-                "candidate": self.session_state["candidate_email"],
-                "proposed_slots": self.session_state["proposed_slots"],
-                "confirmed_slot": self.session_state["confirmed_slot"],
-            }
-            return json.dumps(status)
-        except Exception as e:
-            return f"Error getting status: {str(e)}"
+        status = {
+            "stage": self.session_state["current_stage"],
+            "recruiter": self.session_state["recruiter_email"],
+            "candidate": self.session_state["candidate_email"],
+            "proposed_slots": self.session_state["proposed_slots"],
+            "confirmed_slot": self.session_state["confirmed_slot"],
+        }
+        return orjson.dumps(status).decode()
     
     def _format_slots_for_email(self, slots: List[Dict]) -> str:
         """Format slots for email display"""
@@ -372,7 +473,7 @@ Recruiter
                 f"Start interview scheduling session with recruiter {recruiter_email} and candidate {candidate_email}. "
                 "Follow this workflow: 1) Start session, 2) Send initial email with available slots, "
                 "3) Wait for candidate response, 4) Parse response and find slot intersection, "
-                "5) If intersection found, send confirmation and create calendar event, "
+                "5) If intersection found, use confirm_and_invite to send the confirmation and create the calendar event, "
                 "6) If no intersection, send follow-up email asking for alternative times."
             )
             
@@ -382,4 +483,8 @@ Recruiter
     
     def get_session_state(self) -> Dict:
         """Get current session state"""
-        return self.session_state.copy() 
\ No newline at end of file
+        return self.session_state.copy()
+
+    def close(self):
+        """Release resources held by the agent (backend HTTP session)"""
+        self.backend_client.close() 
\ No newline at end of file
@@ -3,174 +3,291 @@ Slot Manager for Interview Scheduler AI Engine
 Handles recruiter availability and slot intersection logic
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-import pytz
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, lru_cache
+from typing import List, Dict, Optional
+from zoneinfo import ZoneInfo
+import logging
+import re
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# At or above this many candidate slots the fully vectorized path wins over
+# per-candidate binary searches
+_BATCH_MATCH_MIN = 16
+
+# Hoisted UTC singleton: stdlib timezone.utc is a C-level constant, so
+# attaching it via replace() is far cheaper than pytz's localize chain
+_UTC = timezone.utc
+
+# Hand-rolled ISO matcher: one regex covers every candidate format the old
+# strptime ladder handled, without _strptime's locale/regex machinery
+_ISO_RE = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})"
+    r"(?::(\d{2}))?(?:\.(\d+))?(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+def _iso_to_dt(value: str) -> datetime:
+    """Parse an ISO datetime string to an aware datetime (naive = UTC)"""
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_UTC)
+    return dt
+
+@lru_cache(maxsize=4096)
+def _parse_candidate_slot(candidate_slot: str) -> Optional[datetime]:
+    """
+    Parse a candidate-proposed ISO datetime string to an aware datetime.
+
+    Cached: candidates repeat the same times across emails and the same
+    body gets retried, so duplicate strings collapse to one hash lookup
+    (datetime objects are immutable, so sharing them is safe).
+    """
+    m = _ISO_RE.match(candidate_slot)
+    if m:
+        try:
+            # Build the datetime straight from the match groups
+            microsecond = int(m[7].ljust(6, '0')[:6]) if m[7] else 0
+            candidate_dt = datetime(
+                int(m[1]), int(m[2]), int(m[3]),
+                int(m[4]), int(m[5]), int(m[6] or 0), microsecond
+            )
+            offset = m[8]
+            if offset is None or offset == 'Z':
+                # Naive and Z-suffixed timestamps are both treated as UTC
+                return candidate_dt.replace(tzinfo=_UTC)
+            sign = 1 if offset[0] == '+' else -1
+            hours, minutes = int(offset[1:3]), int(offset[-2:])
+            return candidate_dt.replace(tzinfo=timezone(sign * timedelta(hours=hours, minutes=minutes)))
+        except ValueError:
+            # The regex admits out-of-range components (e.g. month 13);
+            # let the stdlib parser below reject them
+            pass
+
+    # Rare shapes (e.g. extended offsets) still get the stdlib parser
+    try:
+        candidate_dt = datetime.fromisoformat(candidate_slot.replace('Z', '+00:00'))
+    except ValueError:
+        logger.warning("Failed to parse %s with any known format", candidate_slot)
+        return None
+
+    if candidate_dt.tzinfo is None:
+        candidate_dt = candidate_dt.replace(tzinfo=_UTC)
+    return candidate_dt
 
 class SlotManager:
     def __init__(self, timezone: str = "UTC"):
-        self.timezone = pytz.timezone(timezone)
+        self._timezone_name = timezone
         self.recruiter_availability = self._generate_default_availability()
-    
+
+    @cached_property
+    def timezone(self) -> ZoneInfo:
+        """Lazily loaded: nothing on the hot path reads this, so the tzdata
+        lookup only happens if a caller actually asks for it"""
+        return ZoneInfo(self._timezone_name)
+
+    @property
+    def recruiter_availability(self) -> List[Dict]:
+        return self._recruiter_availability
+
+    @recruiter_availability.setter
+    def recruiter_availability(self, slots: List[Dict]):
+        """Replace availability and rebuild the sorted epoch index"""
+        self._recruiter_availability = slots
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """
+        Build the unified SoA index: contiguous int64 arrays of epoch-second
+        starts/ends plus a bool availability mask, sorted by start. Every hot
+        path (range queries, intersection, booking) consults these same three
+        arrays via searchsorted/boolean indexing, so they stay cache-resident
+        across calls.
+        """
+        # Parse each slot's bounds exactly once; the aware datetimes are
+        # kept on the dict so emitting matches needs no re-parse either
+        for slot in self._recruiter_availability:
+            if "_start_dt" not in slot:
+                slot["_start_dt"] = _iso_to_dt(slot["start"])
+            if "_end_dt" not in slot:
+                slot["_end_dt"] = _iso_to_dt(slot["end"])
+        # Sort by the parsed datetime, not the raw string: lexicographic ISO
+        # ordering breaks when Z and explicit-offset spellings mix, which
+        # would silently corrupt every searchsorted lookup below
+        self._recruiter_availability.sort(key=lambda s: s["_start_dt"])
+        n = len(self._recruiter_availability)
+        self._starts_np = np.empty(n, dtype=np.int64)
+        self._ends_np = np.empty(n, dtype=np.int64)
+        self._avail_np = np.empty(n, dtype=bool)
+        for i, slot in enumerate(self._recruiter_availability):
+            self._starts_np[i] = int(slot["_start_dt"].timestamp())
+            self._ends_np[i] = int(slot["_end_dt"].timestamp())
+            self._avail_np[i] = bool(slot["available"])
+        # Constant-time gate for find_intersection when everything is booked
+        self._available_count = int(self._avail_np.sum())
+
     def _generate_default_availability(self) -> List[Dict]:
         """
         Generate default recruiter availability for demo
         Available: Mon-Fri, 9 AM - 5 PM, 1-hour slots
         """
-        availability = []
-        base_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Generate slots for next 2 weeks
-        for day_offset in range(14):
-            current_date = base_date + timedelta(days=day_offset)
-            
-            # Skip weekends (5=Saturday, 6=Sunday)
-            if current_date.weekday() >= 5:
-                continue
-            
-            # Generate 1-hour slots from 9 AM to 5 PM
-            for hour in range(9, 17):
-                slot_start = current_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-                slot_end = slot_start + timedelta(hours=1)
-                
-                # Ensure consistent UTC formatting
-                availability.append({
-                    "start": slot_start.isoformat() + "Z",  # Add Z for UTC
-                    "end": slot_end.isoformat() + "Z",      # Add Z for UTC
-                    "available": True,
-                    "duration": 60  # minutes
-                })
-        
-        print(f"[SlotManager] Generated default availability: {len(availability)} slots")
+        # Aware UTC now: the old naive datetime.now() was local time
+        # mislabeled with a "Z" suffix
+        base_date = datetime.now(tz=_UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+        base_ts = int(base_date.timestamp())
+
+        # Vectorized generation: all weekday 9-17h start epochs for the next
+        # 2 weeks come from one broadcast instead of the old nested loops
+        day_offsets = np.arange(14)
+        weekday_mask = ((day_offsets + base_date.weekday()) % 7) < 5  # 5=Sat, 6=Sun
+        day_seconds = day_offsets[weekday_mask] * 86400
+        hour_seconds = np.arange(9, 17) * 3600
+        starts = (base_ts + day_seconds[:, None] + hour_seconds[None, :]).ravel()
+
+        # datetime64 formats both bounds in a single C pass; epochs are UTC
+        # so appending the Z suffix is correct
+        start_strs = np.datetime_as_string(starts.astype("datetime64[s]"), unit="s")
+        end_strs = np.datetime_as_string((starts + 3600).astype("datetime64[s]"), unit="s")
+        availability = [
+            {"start": f"{start}Z", "end": f"{end}Z", "available": True, "duration": 60}
+            for start, end in zip(start_strs, end_strs)
+        ]
+
+        logger.info("Generated default availability: %d slots", len(availability))
         return availability
-    
+
     def get_available_slots(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict]:
         """Get available recruiter slots within date range"""
-        print(f"[SlotManager.get_available_slots] called with start_date={start_date}, end_date={end_date}")
-        if not start_date:
-            start_date = datetime.now().isoformat() + "Z"  # Add Z for UTC consistency
-        if not end_date:
-            end_date = (datetime.now() + timedelta(days=14)).isoformat() + "Z"  # Add Z for UTC consistency
-        
-        available_slots = []
-        for slot in self.recruiter_availability:
-            if start_date <= slot["start"] <= end_date and slot["available"]:
-                available_slots.append(slot)
-        print(f"[SlotManager.get_available_slots] returning {len(available_slots)} slots in range")
+        logger.debug("get_available_slots called with start_date=%s, end_date=%s", start_date, end_date)
+        # Compare epoch ints against the sorted index: one 64-bit compare per
+        # probe, and correct even when bounds mix Z and explicit offsets
+        # (where ISO lexicographic ordering silently breaks). Defaults skip
+        # the string round-trip entirely and use aware UTC now.
+        now = datetime.now(tz=_UTC)
+        lo_ts = int(_iso_to_dt(start_date).timestamp()) if start_date else int(now.timestamp())
+        hi_ts = int(_iso_to_dt(end_date).timestamp()) if end_date else int((now + timedelta(days=14)).timestamp())
+        lo = int(np.searchsorted(self._starts_np, lo_ts, side='left'))
+        hi = int(np.searchsorted(self._starts_np, hi_ts, side='right'))
+        available_slots = [
+            self._recruiter_availability[lo + int(i)]
+            for i in np.nonzero(self._avail_np[lo:hi])[0]
+        ]
+        logger.debug("get_available_slots returning %d slots in range", len(available_slots))
         return available_slots
-    
+
     def find_intersection(self, candidate_slots: List[str]) -> List[Dict]:
         """
         Find intersection between candidate proposed slots and recruiter availability
-        
+
         Args:
             candidate_slots: List of ISO datetime strings from candidate
-            
+
         Returns:
             List of matching slots with intersection details
         """
-        print(f"[SlotManager.find_intersection] candidate_slots={candidate_slots}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("find_intersection candidate_slots=%s", candidate_slots)
+        if self._available_count == 0:
+            # Everything is booked; no candidate can match
+            logger.info("find_intersection: no recruiter slots available")
+            return []
+        if len(candidate_slots) >= _BATCH_MATCH_MIN:
+            intersections = self._find_intersection_batch(candidate_slots)
+        else:
+            intersections = self._find_intersection_scalar(candidate_slots)
+
+        logger.info("find_intersection total intersections=%d", len(intersections))
+        return intersections
+
+    def _make_intersection(self, candidate_slot: str, candidate_dt: datetime, i: int) -> Dict:
+        """Build the intersection record for candidate slot matched at index i"""
+        recruiter_slot = self.recruiter_availability[i]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("match found: %s within %s - %s", candidate_slot, recruiter_slot['start'], recruiter_slot['end'])
+        return {
+            "candidate_slot": candidate_slot,
+            "recruiter_slot": recruiter_slot,
+            "intersection_start": candidate_dt.isoformat(),
+            "intersection_end": recruiter_slot["_end_dt"].isoformat(),
+            "duration": recruiter_slot["duration"]
+        }
+
+    def _find_intersection_scalar(self, candidate_slots: List[str]) -> List[Dict]:
+        """Per-candidate binary search; cheapest for small candidate lists"""
         intersections = []
-        
+        # Bind the index arrays once; attribute lookups inside the loop are
+        # pure overhead on the hot path
+        starts, ends, available = self._starts_np, self._ends_np, self._avail_np
         for candidate_slot in candidate_slots:
             try:
-                # Handle different ISO formats more robustly
-                candidate_slot_clean = candidate_slot.strip()
-                candidate_dt = None
-                
-                # Try parsing with fromisoformat first (most reliable)
-                try:
-                    if candidate_slot_clean.endswith('Z'):
-                        # Handle UTC format by replacing Z with +00:00
-                        candidate_slot_clean = candidate_slot_clean[:-1] + '+00:00'
-                    
-                    candidate_dt = datetime.fromisoformat(candidate_slot_clean)
-                    print(f"[SlotManager.find_intersection] parsed candidate slot: {candidate_slot} -> {candidate_dt}")
-                    
-                except ValueError:
-                    # Fallback to strptime for different formats
-                    print(f"[SlotManager.find_intersection] fromisoformat failed, trying strptime for {candidate_slot}")
-                    
-                    if candidate_slot_clean.endswith('Z'):
-                        # Parse UTC format: 2025-08-25T14:00:00Z
-                        candidate_dt = datetime.strptime(candidate_slot_clean, '%Y-%m-%dT%H:%M:%SZ')
-                        candidate_dt = candidate_dt.replace(tzinfo=pytz.UTC)
-                    elif '.000Z' in candidate_slot_clean:
-                        # Parse format with milliseconds: 2025-08-25T14:00:00.000Z
-                        candidate_dt = datetime.strptime(candidate_slot_clean, '%Y-%m-%dT%H:%M:%S.%fZ')
-                        candidate_dt = candidate_dt.replace(tzinfo=pytz.UTC)
-                    else:
-                        # Try other common formats
-                        for fmt in ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M']:
-                            try:
-                                candidate_dt = datetime.strptime(candidate_slot_clean, fmt)
-                                break
-                            except ValueError:
-                                continue
-                    
-                    if candidate_dt:
-                        print(f"[SlotManager.find_intersection] parsed with strptime: {candidate_dt}")
-                    else:
-                        print(f"[SlotManager.find_intersection] Failed to parse {candidate_slot} with any known format")
-                        continue
-                
-                # Ensure candidate_dt is timezone-aware
-                if candidate_dt.tzinfo is None:
-                    candidate_dt = pytz.UTC.localize(candidate_dt)
-                
-                # Find matching recruiter slots
-                for recruiter_slot in self.recruiter_availability:
-                    if not recruiter_slot["available"]:
-                        continue
-                    
-                    try:
-                        # Parse recruiter slots (they should be in UTC)
-                        recruiter_start = datetime.fromisoformat(recruiter_slot["start"].replace('Z', '+00:00'))
-                        recruiter_end = datetime.fromisoformat(recruiter_slot["end"].replace('Z', '+00:00'))
-                        
-                        # Ensure recruiter times are timezone-aware
-                        if recruiter_start.tzinfo is None:
-                            recruiter_start = pytz.UTC.localize(recruiter_start)
-                        if recruiter_end.tzinfo is None:
-                            recruiter_end = pytz.UTC.localize(recruiter_end)
-                        
-                        print(f"[SlotManager.find_intersection] checking recruiter slot: {recruiter_start} - {recruiter_end}")
-                        
-                        # Check if candidate slot overlaps with recruiter slot
-                        if (recruiter_start <= candidate_dt < recruiter_end):
-                            intersections.append({
-                                "candidate_slot": candidate_slot,
-                                "recruiter_slot": recruiter_slot,
-                                "intersection_start": candidate_dt.isoformat(),
-                                "intersection_end": recruiter_end.isoformat(),
-                                "duration": recruiter_slot["duration"]
-                            })
-                            print(f"[SlotManager.find_intersection] match found: {candidate_slot} within {recruiter_slot['start']} - {recruiter_slot['end']}")
-                            break
-                            
-                    except ValueError as recruiter_parse_error:
-                        print(f"[SlotManager.find_intersection] Error parsing recruiter slot: {recruiter_parse_error}")
-                        continue
-                        
+                candidate_dt = _parse_candidate_slot(candidate_slot.strip())
+                if candidate_dt is None:
+                    continue
+
+                # Recruiter slots are disjoint and sorted, so one binary
+                # search on the epoch index replaces the old per-slot parse
+                # loop. Checks are ordered cheapest-first: bounds, then the
+                # bool availability flag, then the end comparison.
+                cts = int(candidate_dt.timestamp())
+                i = int(np.searchsorted(starts, cts, side='right')) - 1
+                if i < 0 or not available[i] or cts >= ends[i]:
+                    continue
+
+                intersections.append(self._make_intersection(candidate_slot, candidate_dt, i))
             except Exception as e:
-                print(f"[SlotManager.find_intersection] Error processing candidate slot {candidate_slot}: {e}")
+                logger.warning("Error processing candidate slot %s: %s", candidate_slot, e)
                 continue
-        
-        print(f"[SlotManager.find_intersection] total intersections={len(intersections)}")
         return intersections
-    
+
+    def _find_intersection_batch(self, candidate_slots: List[str]) -> List[Dict]:
+        """One vectorized searchsorted over all candidates at once"""
+        parsed = []
+        for candidate_slot in candidate_slots:
+            # Guard each candidate like the scalar path: one bad slot must
+            # not discard the whole batch
+            try:
+                candidate_dt = _parse_candidate_slot(candidate_slot.strip())
+            except Exception as e:
+                logger.warning("Error processing candidate slot %s: %s", candidate_slot, e)
+                continue
+            if candidate_dt is not None:
+                parsed.append((candidate_slot, candidate_dt))
+        if not parsed:
+            return []
+
+        cts = np.fromiter((int(dt.timestamp()) for _, dt in parsed), dtype=np.int64, count=len(parsed))
+        idx = np.searchsorted(self._starts_np, cts, side='right') - 1
+        valid = idx >= 0
+        safe_idx = np.where(valid, idx, 0)
+        mask = valid & self._avail_np[safe_idx] & (cts < self._ends_np[safe_idx])
+
+        return [
+            self._make_intersection(parsed[k][0], parsed[k][1], int(idx[k]))
+            for k in np.nonzero(mask)[0]
+        ]
+
     def get_best_match(self, intersections: List[Dict]) -> Optional[Dict]:
         """Get the best matching slot from intersections"""
         if not intersections:
-            print("[SlotManager.get_best_match] no intersections available")
+            logger.debug("get_best_match: no intersections available")
             return None
-        print(f"[SlotManager.get_best_match] returning first of {len(intersections)} intersections")
+        logger.debug("get_best_match: returning first of %d intersections", len(intersections))
         return intersections[0]
-    
+
     def mark_slot_booked(self, slot_start: str, slot_end: str):
         """Mark a slot as booked (unavailable)"""
-        for slot in self.recruiter_availability:
-            if slot["start"] == slot_start and slot["end"] == slot_end:
-                slot["available"] = False
-                print(f"[SlotManager.mark_slot_booked] marked as booked: {slot_start} - {slot_end}")
-                break 
\ No newline at end of file
+        # Same index, same binary search as the read paths; matching on
+        # epoch seconds also tolerates equivalent ISO spellings (Z vs
+        # +00:00) that exact string comparison would miss
+        start_ts = int(_iso_to_dt(slot_start).timestamp())
+        end_ts = int(_iso_to_dt(slot_end).timestamp())
+        idx = int(np.searchsorted(self._starts_np, start_ts, side='left'))
+        if (idx < len(self._recruiter_availability)
+                and self._starts_np[idx] == start_ts
+                and self._ends_np[idx] == end_ts):
+            if self._avail_np[idx]:
+                self._available_count -= 1
+            self._recruiter_availability[idx]["available"] = False
+            self._avail_np[idx] = False
+            logger.info("marked as booked: %s - %s", slot_start, slot_end)
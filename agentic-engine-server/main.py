@@ -4,6 +4,7 @@ Main entry point for the Interview Scheduler AI Engine
 Demonstrates the complete scheduling workflow
 """
 
+import logging
 import os
 import sys
 from dotenv import load_dotenv
@@ -14,6 +15,7 @@ def main():
     
     # Load environment variables
     load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
     
     # Get configuration
     google_api_key = os.getenv("GOOGLE_API_KEY")
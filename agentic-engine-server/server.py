@@ -1,69 +1,186 @@
+import asyncio
+import atexit
+import logging
 import os
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, EmailStr
 from dotenv import load_dotenv
 from ai_engine.scheduler_agent import SchedulerAgent
 
 load_dotenv()
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
-app = FastAPI()
+# Request logging goes through a queue so handler threads never block on
+# stdout's lock; a background listener does the actual I/O
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger("engine")
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
+# orjson for response serialization: ingest responses embed parsed slot
+# details and orjson serializes them several times faster than stdlib json
+app = FastAPI(default_response_class=ORJSONResponse)
 
-# Initialize agent once
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3009")
 if not GOOGLE_API_KEY:
     raise RuntimeError("GOOGLE_API_KEY not set")
 
-agent = SchedulerAgent(google_api_key=GOOGLE_API_KEY, backend_url=BACKEND_URL)
+# One agent per scheduling session: the old single module-level agent meant
+# concurrent candidates clobbered each other's session_state. Each session
+# gets its own lock so distinct sessions proceed in parallel while requests
+# for the same session stay serialized.
+SESSIONS: dict[str, SchedulerAgent] = {}
+SESSION_LOCKS: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+_sessions_guard = threading.Lock()
+_latest_session_id: Optional[str] = None
+# Last-activity timestamps driving idle eviction: without it every
+# /kickoff leaked an agent, its LLM stack and an unclosed async client
+_session_touched: dict[str, float] = {}
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+def _resolve_agent(session_id: Optional[str], candidate_email: Optional[str] = None) -> tuple[str, SchedulerAgent]:
+    """
+    Look up the agent for an incoming request. The Node backend sends its
+    own session id (not ours) on /ingestEmail, so the id rarely matches;
+    the sender address is the reliable key — each session stores its
+    candidate's email at kickoff. Only when neither matches does this fall
+    back to the most recently started session (the previous single-agent
+    behavior, still needed for senderless callers).
+    """
+    with _sessions_guard:
+        if session_id and session_id in SESSIONS:
+            _session_touched[session_id] = time.monotonic()
+            return session_id, SESSIONS[session_id]
+        if candidate_email:
+            # Most recent first, in case two sessions share a candidate
+            for sid in reversed(SESSIONS):
+                if SESSIONS[sid].session_state.get("candidate_email") == candidate_email:
+                    _session_touched[sid] = time.monotonic()
+                    return sid, SESSIONS[sid]
+        if _latest_session_id is not None:
+            _session_touched[_latest_session_id] = time.monotonic()
+            return _latest_session_id, SESSIONS[_latest_session_id]
+    raise HTTPException(status_code=404, detail="No active scheduling session")
+
+def _remove_session(session_id: str) -> None:
+    """Drop a session's bookkeeping and release its agent's resources"""
+    global _latest_session_id
+    with _sessions_guard:
+        agent = SESSIONS.pop(session_id, None)
+        SESSION_LOCKS.pop(session_id, None)
+        _session_touched.pop(session_id, None)
+        if _latest_session_id == session_id:
+            _latest_session_id = next(reversed(SESSIONS), None)
+    if agent is not None:
+        try:
+            agent.close()
+        except Exception as e:
+            logger.warning("[ENGINE] error closing session %s: %s", session_id, e)
+
+def _evict_stale_sessions() -> None:
+    """Close and drop sessions idle longer than SESSION_TTL_SECONDS"""
+    cutoff = time.monotonic() - SESSION_TTL_SECONDS
+    with _sessions_guard:
+        stale = [sid for sid, touched in _session_touched.items() if touched < cutoff]
+    for sid in stale:
+        logger.info("[ENGINE] evicting idle session %s", sid)
+        _remove_session(sid)
 
 class KickoffPayload(BaseModel):
     recruiterEmail: EmailStr
     candidateEmail: EmailStr
 
 class IngestEmailPayload(BaseModel):
-    from_: EmailStr | None = None
+    # Plain str: the sender address is only logged, so EmailStr validation
+    # is pure overhead on the hot ingest path
+    from_: str | None = None
     subject: str
     body: str
     sessionId: str | None = None
 
+def _run_kickoff(payload: KickoffPayload) -> dict:
+    """Blocking kickoff work (LLM init + backend email); runs off-loop"""
+    global _latest_session_id
+    _evict_stale_sessions()
+    session_id = uuid.uuid4().hex
+    agent = SchedulerAgent(google_api_key=GOOGLE_API_KEY, backend_url=BACKEND_URL)
+    agent.session_state["recruiter_email"] = payload.recruiterEmail
+    agent.session_state["candidate_email"] = payload.candidateEmail
+    agent.session_state["current_stage"] = "session_started"
+    with _sessions_guard:
+        SESSIONS[session_id] = agent
+        _latest_session_id = session_id
+        _session_touched[session_id] = time.monotonic()
+    logger.info("[ENGINE /kickoff] session %s initialized locally", session_id)
+    result2 = agent._send_initial_email_tool()
+    logger.info("[ENGINE /kickoff] send_initial_email_tool -> %s", result2)
+    return {"status": "kickoff_started", "sessionId": session_id}
+
+def _run_ingest(payload: IngestEmailPayload) -> dict:
+    """Blocking ingest pipeline for one session; runs off-loop"""
+    session_id, agent = _resolve_agent(payload.sessionId, candidate_email=payload.from_)
+    # Bind the tool methods once; each agent.<method> access repeats the
+    # instance/MRO lookup and builds a fresh bound method
+    parse_response = agent._parse_candidate_response_tool
+    find_intersection = agent._find_slot_intersection_tool
+    confirm_and_invite = agent._confirm_and_invite_tool
+    send_follow_up = agent._send_follow_up_email_tool
+    with SESSION_LOCKS[session_id]:
+        result_parse = parse_response(payload.body)
+        logger.info("[ENGINE /ingestEmail] parse_candidate_response_tool -> %s", result_parse)
+        result_intersect = find_intersection()
+        logger.info("[ENGINE /ingestEmail] find_slot_intersection_tool -> %s", result_intersect)
+        if agent.session_state.get("confirmed_slot"):
+            confirm_res = confirm_and_invite()
+            logger.info("[ENGINE /ingestEmail] confirm_and_invite -> %s", confirm_res)
+            result = {"status": "confirmed", "details": result_intersect}
+        else:
+            follow_res = send_follow_up()
+            logger.info("[ENGINE /ingestEmail] follow_up -> %s", follow_res)
+            result = {"status": "no_intersection", "details": result_intersect}
+    if result["status"] == "confirmed":
+        # Scheduling is done for this session; free its agent eagerly
+        # instead of waiting for the idle TTL
+        _remove_session(session_id)
+    return result
+
+# Handlers are async and push the blocking LLM/HTTP pipelines onto worker
+# threads: with sync def handlers uvicorn parked every request on the same
+# small threadpool, so one slow LLM call stalled unrelated requests.
 @app.post("/kickoff")
-def kickoff(payload: KickoffPayload):
+async def kickoff(payload: KickoffPayload):
     try:
-        print(f"[ENGINE /kickoff] recruiter={payload.recruiterEmail} candidate={payload.candidateEmail}")
-        agent.session_state["recruiter_email"] = payload.recruiterEmail
-        agent.session_state["candidate_email"] = payload.candidateEmail
-        agent.session_state["current_stage"] = "session_started"
-        print("[ENGINE /kickoff] session initialized locally")
-        result2 = agent._send_initial_email_tool()
-        print(f"[ENGINE /kickoff] send_initial_email_tool -> {result2}")
-        return {"status": "kickoff_started"}
+        logger.info("[ENGINE /kickoff] recruiter=%s candidate=%s", payload.recruiterEmail, payload.candidateEmail)
+        return await asyncio.to_thread(_run_kickoff, payload)
     except Exception as e:
-        print(f"[ENGINE /kickoff] ERROR: {e}")
+        logger.error("[ENGINE /kickoff] ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/ingestEmail")
-def ingest_email(payload: IngestEmailPayload):
+async def ingest_email(payload: IngestEmailPayload):
     try:
-        print(f"[ENGINE /ingestEmail] subject={payload.subject} from={payload.from_} body_len={len(payload.body) if payload.body else 0}")
-        result_parse = agent._parse_candidate_response_tool(payload.body)
-        print(f"[ENGINE /ingestEmail] parse_candidate_response_tool -> {result_parse}")
-        result_intersect = agent._find_slot_intersection_tool()
-        print(f"[ENGINE /ingestEmail] find_slot_intersection_tool -> {result_intersect}")
-        if agent.session_state.get("confirmed_slot"):
-            conf_res = agent._send_confirmation_email_tool()
-            cal_res = agent._create_calendar_event_tool()
-            print(f"[ENGINE /ingestEmail] confirmation -> {conf_res}")
-            print(f"[ENGINE /ingestEmail] calendar -> {cal_res}")
-            return {"status": "confirmed", "details": result_intersect}
-        else:
-            follow_res = agent._send_follow_up_email_tool()
-            print(f"[ENGINE /ingestEmail] follow_up -> {follow_res}")
-            return {"status": "no_intersection", "details": result_intersect}
+        logger.info("[ENGINE /ingestEmail] subject=%s from=%s body_len=%d", payload.subject, payload.from_, len(payload.body) if payload.body else 0)
+        return await asyncio.to_thread(_run_ingest, payload)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[ENGINE /ingestEmail] ERROR: {e}")
+        logger.error("[ENGINE /ingestEmail] ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/status")
-def status():
-    print(f"[ENGINE /status] stage={agent.session_state.get('current_stage')} candidate={agent.session_state.get('candidate_email')}")
-    return agent.get_session_state() 
\ No newline at end of file
+async def status(sessionId: Optional[str] = None):
+    _, agent = _resolve_agent(sessionId)
+    logger.info("[ENGINE /status] stage=%s candidate=%s", agent.session_state.get("current_stage"), agent.session_state.get("candidate_email"))
+    return agent.get_session_state()